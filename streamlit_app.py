@@ -3,21 +3,46 @@ import pandas as pd
 import numpy as np
 import seaborn as sns
 import matplotlib.pyplot as plt
-import folium
-from folium.plugins import MarkerCluster
+import pydeck as pdk
+from scipy import sparse
 from sklearn.preprocessing import LabelEncoder, StandardScaler
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import HistGradientBoostingClassifier
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import csv as pacsv
 from io import BytesIO
 import zipfile
+import tempfile
 import os
 
 # Set wide layout
 st.set_page_config(layout="wide")
 
+# Repeated low-cardinality text columns, read as dictionary (category) columns
+CATEGORY_COLUMNS = ['Crime type', 'Reported by', 'Falls within', 'Last outcome category', 'LSOA name']
+# Columns a crime record cannot be used without
+REQUIRED_COLUMNS = ['Crime ID', 'Crime type', 'Latitude', 'Longitude']
+# CSV is parsed in blocks of this many bytes to cap peak memory
+CSV_BLOCK_SIZE = 16 << 20
+# Bump whenever the cleaning in load_data changes, so older Parquet sidecars are ignored
+CLEANED_DATA_VERSION = 2
+# Rows sampled for the correlation heatmap unless the user asks for all of them
+CORR_SAMPLE_ROWS = 100_000
+
 # Loading Data Function (It auto-load from data folder)
+@st.cache_data(show_spinner="Loading crime data...")
 def load_data():
-    # Attempting to load local ZIP containing the CSV
     zip_path = os.path.join('data', 'humberside-street-merged.zip')
+    # Cleaned copy written on the first load, reused until the ZIP is replaced or the cleaning changes
+    parquet_path = os.path.join('data', f'humberside-street-merged.v{CLEANED_DATA_VERSION}.parquet')
+    if os.path.exists(parquet_path) and (not os.path.exists(zip_path) or
+                                         os.path.getmtime(parquet_path) >= os.path.getmtime(zip_path)):
+        try:
+            return pd.read_parquet(parquet_path)
+        except (OSError, ValueError, pa.ArrowException):
+            pass  # unreadable sidecar, rebuild it from the ZIP below
+
+    # Attempting to load local ZIP containing the CSV
     if os.path.exists(zip_path):
         with zipfile.ZipFile(zip_path, 'r') as zf:
             csvs = [f for f in zf.namelist() if f.lower().endswith('.csv')]
@@ -25,7 +50,28 @@ def load_data():
                 st.error("No CSV file found inside data/humberside-street-merged.zip.")
                 st.stop()
             with zf.open(csvs[0]) as f:
-                df = pd.read_csv(f)
+                # Stream the CSV block by block with the multi-threaded Arrow parser.
+                # Types are fixed up front since a streaming reader only infers from the first block.
+                # Coordinates stay text here so one malformed value can't abort the parse.
+                column_types = {'Crime ID': pa.string(), 'Month': pa.string(), 'Location': pa.string(),
+                                'LSOA code': pa.string(), 'Context': pa.string(),
+                                'Longitude': pa.string(), 'Latitude': pa.string()}
+                column_types.update({c: pa.dictionary(pa.int32(), pa.string()) for c in CATEGORY_COLUMNS})
+                reader = pacsv.open_csv(
+                    f,
+                    read_options=pacsv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+                    convert_options=pacsv.ConvertOptions(column_types=column_types, strings_can_be_null=True)
+                )
+                batches = []
+                for batch in reader:
+                    # Only keep usable rows of each block in memory
+                    valid = pc.is_valid(batch.column(REQUIRED_COLUMNS[0]))
+                    for col in REQUIRED_COLUMNS[1:]:
+                        valid = pc.and_(valid, pc.is_valid(batch.column(col)))
+                    batches.append(batch.filter(valid))
+                table = pa.Table.from_batches(batches, schema=reader.schema)
+                df = table.to_pandas(split_blocks=True, self_destruct=True)
+                del table
     else:
         st.error("Data archive not found in data/. Please add humberside-street-merged.zip.")
         st.stop()
@@ -34,33 +80,171 @@ def load_data():
     df.columns = df.columns.str.strip().str.lower().str.replace(' ', '_')
     df['longitude'] = pd.to_numeric(df['longitude'], errors='coerce')
     df['latitude'] = pd.to_numeric(df['latitude'], errors='coerce')
-    df['location'] = df['location'].astype(str).str.strip()
-    df = df.dropna(subset=['crime_id', 'crime_type', 'latitude', 'longitude'])
+    df = df.dropna(subset=['latitude', 'longitude'])
+    df['location'] = df['location'].astype(str).str.strip().astype('category')
+    # float32 is ample for street-level coordinates and halves the bytes scanned by filters
+    df[['latitude', 'longitude']] = df[['latitude', 'longitude']].astype(np.float32)
     df = df.drop_duplicates(subset=['crime_id']).reset_index(drop=True)
+    # Drop categories emptied by the cleaning so counts/plots only show real values
+    for col in df.select_dtypes('category').columns:
+        df[col] = df[col].cat.remove_unused_categories()
+    # Write to a temp file and swap it in, so an interrupted write never leaves a truncated sidecar
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir='data', suffix='.parquet.tmp')
+        os.close(fd)
+        df.to_parquet(tmp_path, compression='zstd', index=False)
+        os.replace(tmp_path, parquet_path)
+    except OSError:
+        # Read-only or full disk: parse the ZIP again on the next cold start
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
     return df
 
-# Prediction model preparation\@st.cache_data
-def train_model(df):
-    df_model = df.dropna(subset=['lsoa_code', 'lsoa_name']).copy()
-    rare = df_model['crime_type'].value_counts()[df_model['crime_type'].value_counts() < 1000].index
-    df_model['crime_type'] = df_model['crime_type'].apply(lambda x: 'Other' if x in rare else x)
+# Prediction model preparation (kept alive across reruns, no re-fit on every click)
+@st.cache_resource(show_spinner="Training prediction model...")
+def train_model(_df):
+    # Leading underscore tells Streamlit not to hash the (already cached) frame
+    df_model = _df.dropna(subset=['lsoa_code', 'lsoa_name']).copy()
+    # Fold rare crime types into 'Other' with one vectorised mask
+    crime_counts = df_model['crime_type'].value_counts()
+    rare = crime_counts.index[crime_counts < 1000]
+    crime_type = df_model['crime_type']
+    if 'Other' not in crime_type.cat.categories:
+        crime_type = crime_type.cat.add_categories('Other')
+    df_model['crime_type'] = crime_type.mask(crime_type.isin(rare), 'Other').cat.remove_unused_categories()
     features = ['longitude', 'latitude', 'reported_by', 'falls_within', 'last_outcome_category']
     X = df_model[features]
     y = df_model['crime_type']
-    # Encode
+    # Encode (categorical columns already carry integer codes, no LabelEncoder needed)
     X_enc = X.copy()
-    label_encoders = {}
+    # Code of each column's most common value, used to fill the simulated rows in Tab 3
+    mode_codes = {}
     for col in ['reported_by', 'falls_within', 'last_outcome_category']:
-        le = LabelEncoder()
-        X_enc[col] = le.fit_transform(X_enc[col])
-        label_encoders[col] = le
+        X_enc[col] = X_enc[col].cat.codes.astype(np.int32)
+        mode_codes[col] = df_model[col].cat.categories.get_loc(df_model[col].mode()[0])
     scaler = StandardScaler()
     X_enc[['longitude', 'latitude']] = scaler.fit_transform(X_enc[['longitude', 'latitude']])
     le_target = LabelEncoder()
     y_enc = le_target.fit_transform(y)
-    rf = RandomForestClassifier(n_estimators=100, random_state=42, class_weight='balanced')
-    rf.fit(X_enc, y_enc)
-    return rf, le_target, scaler, label_encoders, X, df_model
+    # Histogram gradient boosting trains and predicts far faster than a random forest on this data
+    model = HistGradientBoostingClassifier(
+        max_iter=200,
+        max_depth=8,
+        learning_rate=0.1,
+        categorical_features=list(mode_codes),
+        class_weight='balanced',
+        random_state=42
+    )
+    model.fit(X_enc, y_enc)
+    return model, le_target, scaler, mode_codes, X, df_model
+
+# Simulated 6-month forecast (inference runs once, later reruns reuse the predictions)
+@st.cache_data(show_spinner="Predicting future crimes...")
+def predict_future(_df):
+    model, le_target, scaler, mode_codes, X_train, df_model = train_model(_df)
+    lon_min, lon_max = df_model['longitude'].min(), df_model['longitude'].max()
+    lat_min, lat_max = df_model['latitude'].min(), df_model['latitude'].max()
+    # All 6 months x 5000 points are scored in a single predict call
+    n_points, n_months = 5000, 6
+    n_rows = n_points * n_months
+    months = np.repeat(np.arange(1, n_months + 1), n_points)
+    # One seeded generator call fills both coordinate columns
+    rng = np.random.default_rng(42)
+    coords = rng.uniform([lon_min, lat_min], [lon_max, lat_max], size=(n_rows, 2))
+    fut_X = pd.DataFrame(coords, columns=['longitude', 'latitude'])
+    fut_X[['longitude', 'latitude']] = scaler.transform(fut_X)
+    for col, code in mode_codes.items():
+        fut_X[col] = np.full(n_rows, code, dtype=np.int32)
+    preds = model.predict(fut_X[X_train.columns])
+    return pd.DataFrame({
+        'simulated_month': months,
+        'predicted_crime_type': le_target.inverse_transform(preds)
+    })
+
+# Correlation of location with one-hot crime types and outcomes, computed from a
+# sparse indicator matrix instead of a dense get_dummies frame
+@st.cache_data(show_spinner=False)
+def correlation_matrix(_df, n_rows):
+    # Correlations are stable on a random subsample, so only n_rows are used
+    if n_rows < len(_df):
+        _df = _df.sample(n=n_rows, random_state=0)
+    n = len(_df)
+    coords = _df[['latitude', 'longitude']].to_numpy(dtype=np.float64)
+    coords = coords - coords.mean(axis=0)
+    blocks, labels = [], ['latitude', 'longitude']
+    for col, prefix in [('crime_type', 'crime'), ('last_outcome_category', 'outcome')]:
+        codes = _df[col].cat.codes.to_numpy()
+        rows = np.flatnonzero(codes >= 0)  # missing values get no indicator, like get_dummies
+        categories = _df[col].cat.categories
+        blocks.append(sparse.csr_matrix((np.ones(len(rows)), (rows, codes[rows])), shape=(n, len(categories))))
+        labels += [f"{prefix}_{c}" for c in categories]
+    onehot = sparse.hstack(blocks, format='csr')
+    onehot_mean = np.asarray(onehot.mean(axis=0)).ravel()
+    # Covariance blocks: coords x coords, one-hot x coords, one-hot x one-hot
+    cross = onehot.T @ coords / n
+    cov = np.block([
+        [coords.T @ coords / n, cross.T],
+        [cross, (onehot.T @ onehot).toarray() / n - np.outer(onehot_mean, onehot_mean)]
+    ])
+    std = np.sqrt(np.diag(cov))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = cov / np.outer(std, std)
+    return pd.DataFrame(corr, index=labels, columns=labels)
+
+# Render a finished figure to PNG bytes (same settings st.pyplot uses)
+def figure_png(fig):
+    buf = BytesIO()
+    fig.savefig(buf, format='png', bbox_inches='tight', dpi=200)
+    plt.close(fig)
+    return buf.getvalue()
+
+# Plot builders are cached on their small aggregated inputs, so reruns skip seaborn/matplotlib
+@st.cache_data(show_spinner=False)
+def heatmap_png(corr):
+    fig, ax = plt.subplots(figsize=(10, 8))
+    sns.heatmap(corr, center=0, cbar_kws={'shrink': .5}, ax=ax)
+    ax.set_title("Correlation Matrix")
+    return figure_png(fig)
+
+@st.cache_data(show_spinner=False)
+def barplot_png(values, title):
+    fig, ax = plt.subplots()
+    # Plain string labels keep the bars in value order rather than category order
+    sns.barplot(y=values.index.astype(str), x=values.values, ax=ax)
+    ax.set_title(title)
+    return figure_png(fig)
+
+# Cleaned data downloads, serialised once instead of on every rerun. cache_resource hands
+# back the same bytes object rather than unpickling a fresh ~65 MB copy per rerun.
+@st.cache_resource(show_spinner=False)
+def cleaned_csv(_df_model):
+    buf = BytesIO()
+    pacsv.write_csv(pa.Table.from_pandas(_df_model, preserve_index=False), buf)
+    return buf.getvalue()
+
+@st.cache_resource(show_spinner=False)
+def cleaned_parquet(_df_model):
+    return _df_model.to_parquet(index=False)
+
+# Bin map points into small lat/lon cells once, so the browser gets one point per
+# occupied cell instead of every crime record
+@st.cache_data(show_spinner=False)
+def crime_map_cells(_df, center_lat, center_lon, cell_size):
+    lat = _df['latitude'].to_numpy()
+    lon = _df['longitude'].to_numpy()
+    # Filter to within ~1.0 degrees of Humberside center
+    inside = (np.abs(lat - center_lat) <= 1.0) & (np.abs(lon - center_lon) <= 1.0)
+    cells = pd.DataFrame({
+        'lat_cell': np.floor(lat[inside] / cell_size).astype(np.int32),
+        'lon_cell': np.floor(lon[inside] / cell_size).astype(np.int32)
+    }).value_counts().reset_index(name='count')
+    return pd.DataFrame({
+        'latitude': (cells['lat_cell'] + 0.5) * cell_size,
+        'longitude': (cells['lon_cell'] + 0.5) * cell_size,
+        'count': cells['count'],
+        'radius': 15 * np.sqrt(cells['count'])
+    })
 
 # Main App
 def main():
@@ -87,41 +271,32 @@ def main():
         This heatmap is to showcase the correlations between the different variables of the data set like crime type, last outcome, and map location of crime.
             """
         st.markdown(f"<div style='text-align: justify;'>{description2}</div>", unsafe_allow_html=True)
-        corr_df = pd.concat([
-            df[['latitude', 'longitude']],
-            pd.get_dummies(df['crime_type'], prefix='crime'),
-            pd.get_dummies(df['last_outcome_category'], prefix='outcome')
-        ], axis=1)
-        fig, ax = plt.subplots(figsize=(10, 8))
-        sns.heatmap(corr_df.corr(), center=0, cbar_kws={'shrink': .5}, ax=ax)
-        ax.set_title("Correlation Matrix")
-        st.pyplot(fig)
+        # Correlations use a sample by default; the full data is one click away on large frames
+        corr_rows = len(df)
+        if len(df) > CORR_SAMPLE_ROWS and not st.checkbox(f"Use all {len(df):,} rows (slower)"):
+            corr_rows = CORR_SAMPLE_ROWS
+        st.image(heatmap_png(correlation_matrix(df, corr_rows)))
 
         st.subheader("3. Interactive Crime Map (Humberside Area)")
         description3 = """
            This map showcases the location of crime near to 1.0 degrees of Humberside center. Come on interact with it and find out all the trends related to Humberside crimes.
             """
         st.markdown(f"<div style='text-align: justify;'>{description3}</div>", unsafe_allow_html=True)
-        # Filter to within ~1.0 degrees of Humberside center
         center_lat, center_lon = 53.5, -1.1
-        df_map = df[(df['latitude'].between(center_lat-1.0, center_lat+1.0)) &
-                    (df['longitude'].between(center_lon-1.0, center_lon+1.0))]
-        # Sample to max 100000 points for performance
-        df_sample = df_map.sample(n=min(len(df_map), 100000), random_state=42)
-
-        m = folium.Map(location=[center_lat, center_lon], zoom_start=10)
-        marker_cluster = MarkerCluster().add_to(m)
-        for _, row in df_sample.iterrows():
-            folium.CircleMarker(
-                location=[row['latitude'], row['longitude']],
-                radius=3,
-                color='red',
-                fill=True,
-                fill_opacity=0.6
-            ).add_to(marker_cluster)
-        # Rendering the map directly
-        map_html = m._repr_html_()
-        st.components.v1.html(map_html, height=600)
+        # ~100 m cells: roughly 20x fewer points than crimes, sized by how many fall in each
+        df_cells = crime_map_cells(df, center_lat, center_lon, 0.001)
+        layer = pdk.Layer(
+            "ScatterplotLayer",
+            data=df_cells,
+            get_position='[longitude, latitude]',
+            get_radius='radius',
+            radius_min_pixels=1,
+            get_fill_color=[255, 0, 0, 150],
+            pickable=True
+        )
+        view_state = pdk.ViewState(latitude=center_lat, longitude=center_lon, zoom=9)
+        deck = pdk.Deck(layers=[layer], initial_view_state=view_state, tooltip={'text': '{count} crimes'})
+        st.pydeck_chart(deck, height=600)
 
     # ===== Tab 2: EDA Analysis =====
     with tab2:
@@ -137,18 +312,13 @@ def main():
                             The following plots shows frequency and percentage of data inputs. It includes falls within variables, crime types, and, last outcome of criminal. Falls within explains the jurisdiction under which all the crime falls under. Crime types explains the type of crime particular entry represents. Finally the last outcome explains the punishment received by the criminal.
             """
             st.markdown(f"<div style='text-align: justify;'>{description5}</div>", unsafe_allow_html=True)
+            # Small aggregated frames go straight to the browser's Vega-Lite renderer
             counts = df[col].value_counts()
-            fig, ax = plt.subplots()
-            sns.barplot(y=counts.index, x=counts.values, ax=ax)
-            ax.set_title(f"Counts of {col}")
-            st.pyplot(fig)
+            st.bar_chart(counts.rename('count'), horizontal=True, sort='-count')
 
             st.subheader(f"Percentage Plot: {col}")
-            pct = df[col].value_counts(normalize=True) * 100
-            fig, ax = plt.subplots()
-            sns.barplot(y=pct.index, x=pct.values, ax=ax)
-            ax.set_title(f"Percentage of {col}")
-            st.pyplot(fig)
+            pct = counts / counts.sum() * 100
+            st.bar_chart(pct.rename('percentage'), horizontal=True, sort='-percentage')
 
         st.subheader("Top 10 LSOA Names + 'Other'")
         description6 = """
@@ -156,13 +326,10 @@ def main():
             """
         st.markdown(f"<div style='text-align: justify;'>{description6}</div>", unsafe_allow_html=True)
         
-        lsoa_counts = df['lsoa_name'].value_counts()
-        top10 = lsoa_counts.iloc[:10]
-        top10['Other'] = lsoa_counts.iloc[10:].sum()
-        fig, ax = plt.subplots()
-        sns.barplot(y=top10.index, x=top10.values, ax=ax)
-        ax.set_title("Top 10 LSOA Names")
-        st.pyplot(fig)
+        # Counting the category codes is a bincount; 'Other' is the remainder of the non-null total
+        top10 = df['lsoa_name'].value_counts().head(10).copy()
+        top10['Other'] = df['lsoa_name'].count() - top10.sum()
+        st.image(barplot_png(top10, "Top 10 LSOA Names"))
 
     # ===== Tab 3: Crime Prediction tab =====
     with tab3:
@@ -171,27 +338,9 @@ def main():
           This is the last page folks for this dashboard on Humberside Crime data analysis. Hope you enjoyed it and found new patterns and trends. In this part the crime prediction results are visualised based on the past data of Humberside Crime profile.
             """
         st.markdown(f"<div style='text-align: justify;'>{description7}</div>", unsafe_allow_html=True)
-        rf, le_target, scaler, label_encoders, X_train, df_model = train_model(df)
-
-        lon_min, lon_max = df_model['longitude'].min(), df_model['longitude'].max()
-        lat_min, lat_max = df_model['latitude'].min(), df_model['latitude'].max()
-        future_list = []
-        for m in range(1, 7):
-            random_lons = np.random.uniform(lon_min, lon_max, 5000)
-            random_lats = np.random.uniform(lat_min, lat_max, 5000)
-            df_f = pd.DataFrame({
-                'longitude': random_lons,
-                'latitude': random_lats,
-                'reported_by': label_encoders['reported_by'].transform([df_model['reported_by'].mode()[0]]*5000),
-                'falls_within': label_encoders['falls_within'].transform([df_model['falls_within'].mode()[0]]*5000),
-                'last_outcome_category': label_encoders['last_outcome_category'].transform([df_model['last_outcome_category'].mode()[0]]*5000),
-                'simulated_month': m
-            })
-            df_f[['longitude', 'latitude']] = scaler.transform(df_f[['longitude', 'latitude']])
-            preds = rf.predict(df_f[X_train.columns])
-            df_f['predicted_crime_type'] = le_target.inverse_transform(preds)
-            future_list.append(df_f)
-        fut_df = pd.concat(future_list, ignore_index=True)
+        df_model = train_model(df)[-1]
+
+        fut_df = predict_future(df)
 
         st.subheader("Predicted Crime Types")
         description8 = """
@@ -238,8 +387,8 @@ def main():
 
     # Download cleaned data in sidebar
     st.sidebar.header("Download Cleaned Data CSV")
-    csv_data = df_model.to_csv(index=False).encode()
-    st.sidebar.download_button(label="Download CSV", data=csv_data, file_name='cleaned_data.csv')
+    st.sidebar.download_button(label="Download CSV", data=cleaned_csv(df_model), file_name='cleaned_data.csv')
+    st.sidebar.download_button(label="Download Parquet", data=cleaned_parquet(df_model), file_name='cleaned_data.parquet')
 
 if __name__ == '__main__':
     main()